@@ -5,40 +5,74 @@ Converts quiz CSV files to our standardized XLSX import format
 """
 
 import csv
-import pandas as pd
+import io
+from dataclasses import dataclass
 from pathlib import Path
 import sys
 import re
 
+@dataclass(slots=True)
+class Question:
+    """One parsed question in our template format"""
+    question_type: str  # MC, TF or MA
+    question: str
+    preview: str  # Question text shortened for the Debug sheet
+    explanation: str
+    choices: list  # All available choices, in column order
+    correct_indices: list  # 0-based indices into choices
+    source: str
+    has_explanation: bool
+
 def parse_csv_questions(csv_file_path):
     """Parse CSV file and extract questions in our template format"""
     questions = []
     
     with open(csv_file_path, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
+        reader = csv.reader(file)
+        header = next(reader, [])
+        
+        # Resolve column positions once so each row is plain list indexing
+        columns = {name: i for i, name in enumerate(header)}
+        if 'Question' not in columns:
+            return questions
+        question_idx = columns['Question']
+        explanation_idx = columns.get('Explanation')
+        source_idx = columns.get('Source')
+        correct_idx = columns.get('Correct Answer')
+        
+        # Detect all Choice X columns (flexible - Choice 1, Choice 2, ...)
+        choice_indices = []
+        while f'Choice {len(choice_indices) + 1}' in columns:
+            choice_indices.append(columns[f'Choice {len(choice_indices) + 1}'])
+        
+        used_indices = [question_idx, explanation_idx, source_idx, correct_idx, *choice_indices]
+        max_idx = max(idx for idx in used_indices if idx is not None)
         
         for row in reader:
-            # Skip empty rows
-            if not row.get('Question') or not row['Question'].strip():
+            # Skip empty rows and rows that stop before the Question column
+            if len(row) <= question_idx:
+                continue
+            # Short rows used to crash on the missing fields; pad them with ''
+            if len(row) <= max_idx:
+                row += [''] * (max_idx + 1 - len(row))
+            question_text = row[question_idx].strip()
+            if not question_text:
                 continue
                 
-            question_text = row['Question'].strip()
-            explanation = row.get('Explanation', '').strip()
-            source = row.get('Source', '').strip()
+            explanation = row[explanation_idx].strip() if explanation_idx is not None else ''
+            source = row[source_idx].strip() if source_idx is not None else ''
             
-            # Extract all available choices (flexible - detect all Choice X columns)
+            # Extract all available choices, stopping at the first empty one
             choices = []
-            i = 1
-            while True:
-                choice_key = f'Choice {i}'
-                if choice_key in row and row[choice_key] and row[choice_key].strip():
-                    choices.append(row[choice_key].strip())
-                    i += 1
-                else:
+            for choice_idx in choice_indices:
+                choice = row[choice_idx].strip()
+                if not choice:
                     break
+                choices.append(choice)
             
             # Handle correct answer
-            correct_answer = row.get('Correct Answer', '').strip()
+            correct_answer = row[correct_idx].strip() if correct_idx is not None else ''
+            correct_lower = correct_answer.lower()
             
             # Determine question type
             question_type = 'TF' if len(choices) == 2 and 'True' in choices and 'False' in choices else 'MC'
@@ -55,93 +89,103 @@ def parse_csv_questions(csv_file_path):
                     elif len(x) == 1 and x.isalpha():
                         # Letter-based (A=0, B=1, etc.)
                         correct_indices.append(ord(x) - ord('A'))
-            elif correct_answer.lower() in ['true', 'false']:
+            elif correct_lower == 'true' or correct_lower == 'false':
                 # For True/False questions
-                correct_indices = [0 if correct_answer.lower() == 'true' else 1]
+                correct_indices = [0 if correct_lower == 'true' else 1]
             elif correct_answer.isdigit():
                 # Numeric answer (1-based)
                 correct_indices = [int(correct_answer) - 1]
-            elif len(correct_answer.strip()) == 1 and correct_answer.strip().upper().isalpha():
+            elif len(correct_answer) == 1 and correct_answer.upper().isalpha():
                 # Single letter answer (A, B, C, D)
-                letter = correct_answer.strip().upper()
+                letter = correct_answer.upper()
                 correct_indices = [ord(letter) - ord('A')]
             else:
                 # Try to find answer text match
                 correct_indices = []
                 for i, choice in enumerate(choices):
-                    if choice.lower() == correct_answer.lower():
+                    if choice.lower() == correct_lower:
                         correct_indices = [i]
                         break
             
             # Create question entry with all available choices
-            question_entry = {
-                'type': question_type,
-                'question': question_text,
-                'explanation': explanation,
-                'choices': choices,  # Keep all choices
-                'correct_indices': correct_indices,
-                'source': source
-            }
+            question_entry = Question(
+                question_type=question_type,
+                question=question_text,
+                preview=(question_text[:47] + '...') if len(question_text) > 50 else question_text,
+                explanation=explanation,
+                choices=choices,  # Keep all choices
+                correct_indices=correct_indices,
+                source=source,
+                has_explanation=bool(explanation)  # explanation is already stripped
+            )
             
             questions.append(question_entry)
     
     return questions
 
-def create_xlsx_output(questions, output_file_path, section_id="DTOX101-LESSON1"):
-    """Create XLSX file in our template format"""
-    
-    # Prepare data for Questions sheet
-    rows = []
-    
-    # Add header row
-    rows.append(['Type', 'Question', 'Explanation', 'Answer', 'Correct', 'Meta Key', 'Meta Value'])
-    
-    for q in questions:
+# Numeric parts of a section ID, used for natural sorting ("1.2" before "1.10")
+_DIGITS_RE = re.compile(r'\d+')
+
+# Answer letters for every combination of choices A-D, keyed by bitmask
+_MASK_TO_LETTERS = {
+    mask: ', '.join('ABCD'[i] for i in range(4) if mask & (1 << i))
+    for mask in range(16)
+}
+
+def convert_indices_to_letter(indices):
+    """Convert 0-based correct indices to sorted answer letters (e.g. "A, C")"""
+    mask = 0
+    for idx in indices:
+        if not 0 <= idx < 4 or mask & (1 << idx):
+            # More than four choices or a repeated index - build the letters directly
+            return ', '.join(sorted(chr(65 + i) for i in indices))
+        mask |= 1 << idx
+    return _MASK_TO_LETTERS[mask]
+
+# Questions sheet header and fixed column widths for both sheets
+QUESTION_HEADERS = ['Type', 'Question', 'Explanation', 'Answer', 'Correct', 'Meta Key', 'Meta Value']
+QUESTION_WIDTHS = [6, 50, 40, 40, 8, 10, 20]
+DEBUG_WIDTHS = [30, 18, 50, 15, 10, 16]
+
+def question_sheet_rows(questions, question_sections):
+    """Yield the Questions sheet data rows (after the header), one list per row"""
+    for q, question_section_id in zip(questions, question_sections):
         # First row: question with first answer
-        if q['choices']:  # Only if there are choices
+        if q.choices:  # Only if there are choices
             # Use question's individual source field for Meta Value
-            question_section_id = q['source'] if q['source'] else section_id
-            first_row = [
-                q['type'],
-                q['question'],
-                q['explanation'],
-                q['choices'][0],
-                '1' if 0 in q['correct_indices'] else '',
+            yield [
+                q.question_type,
+                q.question,
+                q.explanation,
+                q.choices[0],
+                '1' if 0 in q.correct_indices else None,
                 'ID',
                 question_section_id
             ]
-            rows.append(first_row)
             
             # Subsequent rows: remaining answers (flexible based on actual choices)
-            for i in range(1, len(q['choices'])):
-                answer_row = [
-                    '',  # Type (empty)
-                    '',  # Question (empty)
-                    '',  # Explanation (empty)
-                    q['choices'][i],  # Answer choice
-                    '1' if i in q['correct_indices'] else '',  # Correct indicator
-                    '',  # Meta Key (empty)
-                    ''   # Meta Value (empty)
+            # Only the Answer and Correct columns are filled
+            for i in range(1, len(q.choices)):
+                yield [
+                    None, None, None,
+                    q.choices[i],
+                    '1' if i in q.correct_indices else None,
+                    None, None
                 ]
-                rows.append(answer_row)
         
         # Blank row after each question
-        rows.append(['', '', '', '', '', '', ''])
-    
-    # Create DataFrame and save to XLSX
-    df_questions = pd.DataFrame(rows[1:], columns=rows[0])
-    
-    # Create comprehensive debug sheet following CLAUDE.md specifications
-    debug_rows = []
+        yield []
+
+def debug_sheet_rows(questions, question_sections):
+    """Yield the Debug sheet rows following CLAUDE.md specifications"""
     
     # Calculate section counts from individual question sources
     section_counts = {}
-    for q in questions:
-        q_section = q['source'] if q['source'] else section_id
+    for q_section in question_sections:
         section_counts[q_section] = section_counts.get(q_section, 0) + 1
     
     # Section 1: Conversion Summary
-    debug_rows.extend([
+    yield from [
         ['Metric', 'Value'],
         ['Total Questions Parsed', len(questions)],
         ['Total Tracks/Sections', len(section_counts)],
@@ -149,7 +193,7 @@ def create_xlsx_output(questions, output_file_path, section_id="DTOX101-LESSON1"
         ['Parsing Errors', 0],  # TODO: Track actual errors
         [''],
         ['Track Details']
-    ])
+    ]
     
     # Add each section's question count with natural sorting
     # Sort by extracting numerical parts for proper ordering (1.1, 1.2, ... 1.10, 1.11, etc.)
@@ -157,67 +201,163 @@ def create_xlsx_output(questions, output_file_path, section_id="DTOX101-LESSON1"
         """Sort key that handles numerical parts correctly"""
         section = item[0]
         # Extract numbers from the section ID for proper sorting
-        import re
-        parts = re.findall(r'\d+', section)
+        parts = _DIGITS_RE.findall(section)
         if len(parts) >= 2:
             # Convert to integers for numerical sorting: e.g., "1.2" -> (1, 2)
             return tuple(int(p) for p in parts)
         return (section,)  # Fallback to string if pattern doesn't match
 
     for section, count in sorted(section_counts.items(), key=natural_sort_key):
-        debug_rows.append([f'  {section}', f'{count} questions'])
+        yield [f'  {section}', f'{count} questions']
     
-    debug_rows.extend([
+    yield from [
         [''],
         ['Parsing Errors:'],
         ['  None detected'],
         [''],
         ['Track', 'Q#', 'Question Preview', 'Correct Answer', 'Page Ref', 'Has Explanation']
-    ])
+    ]
     
     # Section 4: Question Summary Table
-    for i, q in enumerate(questions, 1):
+    for i, (q, q_section) in enumerate(zip(questions, question_sections), 1):
         # Get correct answer letter(s) - handle multiple answers
-        correct_letter = ''
-        if q['correct_indices']:
-            # Convert indices to letters (0->A, 1->B, etc.) - indices are already 0-based
-            correct_letters = [chr(65 + idx) for idx in q['correct_indices']]
-            correct_letter = ', '.join(sorted(correct_letters))
-        
-        # Get question preview (first 50 chars)
-        question_preview = (q['question'][:47] + '...') if len(q['question']) > 50 else q['question']
+        correct_letter = convert_indices_to_letter(q.correct_indices)
         
         # Check if has explanation
-        has_explanation = 'Yes' if q['explanation'].strip() else 'No'
+        has_explanation = 'Yes' if q.has_explanation else 'No'
         
         # Use question's individual source for debug table
-        q_section = q['source'] if q['source'] else section_id
-        debug_rows.append([
+        yield [
             q_section,
             str(i),
-            question_preview,
+            q.preview,  # Question preview (first 50 chars)
             correct_letter,
-            '',  # Page ref not available in CSV
+            None,  # Page ref not available in CSV
             has_explanation
-        ])
+        ]
+
+def write_openpyxl(question_rows, debug_rows, output_file_path):
+    """Write both sheets with openpyxl in write-only mode
+    
+    Rows stream straight to the sheet XML instead of building a Cell per value.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
     
-    # Create debug DataFrame
-    df_debug = pd.DataFrame(debug_rows)
+    wb = Workbook(write_only=True)
     
-    # Write to XLSX with both sheets
-    with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-        df_questions.to_excel(writer, sheet_name='Questions', index=False)
-        df_debug.to_excel(writer, sheet_name='Debug', index=False, header=False)
+    ws_main = wb.create_sheet('Questions')
+    for column, width in zip('ABCDEFG', QUESTION_WIDTHS):
+        ws_main.column_dimensions[column].width = width
+    header_font = Font(bold=True)  # One shared style object for every header cell
+    header_cells = []
+    for header in QUESTION_HEADERS:
+        cell = WriteOnlyCell(ws_main, value=header)
+        cell.font = header_font
+        header_cells.append(cell)
+    ws_main.append(header_cells)
+    for row in question_rows:
+        ws_main.append(row)
+    
+    ws_debug = wb.create_sheet('Debug')
+    for column, width in zip('ABCDEF', DEBUG_WIDTHS):
+        ws_debug.column_dimensions[column].width = width
+    for row in debug_rows:
+        ws_debug.append(row)
+    
+    # Stage the zip in memory and write it to disk in one call; saving to
+    # the path directly issues many small writes while the zip is built
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    with open(output_file_path, 'wb') as file:
+        file.write(buffer.getbuffer())
+
+def write_xlsxwriter(question_rows, debug_rows, output_file_path):
+    """Write both sheets with xlsxwriter in constant-memory mode
+    
+    Each row is flushed to a temp file as soon as the next one starts, so
+    memory stays flat however many questions there are. Rows must be
+    written in order, which both row generators already do.
+    """
+    import xlsxwriter
+    
+    def write_row(ws, row_num, row, cell_format=None):
+        """Write one row, failing loudly if xlsxwriter rejects a cell"""
+        # write_row stops at the first cell it cannot write, which would
+        # silently drop the rest of the row
+        error = ws.write_row(row_num, 0, row, cell_format)
+        if error:
+            raise ValueError(f"xlsxwriter could not write {ws.name} row {row_num + 1} (error {error})")
+    
+    # Keep URL-like text as plain strings, as openpyxl writes it
+    wb = xlsxwriter.Workbook(str(output_file_path), {
+        'constant_memory': True,
+        'use_zip64': True,
+        'strings_to_urls': False
+    })
+    header_format = wb.add_format({'bold': True})
+    
+    completed = False
+    try:
+        ws_main = wb.add_worksheet('Questions')
+        for col, width in enumerate(QUESTION_WIDTHS):
+            ws_main.set_column(col, col, width)
+        write_row(ws_main, 0, QUESTION_HEADERS, header_format)
+        for row_num, row in enumerate(question_rows, 1):
+            write_row(ws_main, row_num, row)
+        
+        ws_debug = wb.add_worksheet('Debug')
+        for col, width in enumerate(DEBUG_WIDTHS):
+            ws_debug.set_column(col, col, width)
+        for row_num, row in enumerate(debug_rows):
+            write_row(ws_debug, row_num, row)
+        
+        completed = True
+    finally:
+        # Always close so xlsxwriter releases its temp files, even when a
+        # row generator raises partway through
+        wb.close()
+        if not completed:
+            # Don't leave a half-written workbook behind
+            Path(output_file_path).unlink(missing_ok=True)
+
+def create_xlsx_output(questions, output_file_path, section_id="DTOX101-LESSON1", engine="openpyxl"):
+    """Create XLSX file in our template format
+    
+    engine selects the writer backend: "openpyxl" (default) or "xlsxwriter",
+    which uses xlsxwriter's constant-memory mode for large batches.
+    """
+    if engine == 'xlsxwriter':
+        writer = write_xlsxwriter
+    elif engine == 'openpyxl':
+        writer = write_openpyxl
+    else:
+        raise ValueError(f"Unknown engine {engine!r}: expected 'openpyxl' or 'xlsxwriter'")
+    
+    # Resolve each question's section once: its own source, else section_id
+    question_sections = [q.source if q.source else section_id for q in questions]
+    
+    question_rows = question_sheet_rows(questions, question_sections)
+    debug_rows = debug_sheet_rows(questions, question_sections)
+    
+    writer(question_rows, debug_rows, output_file_path)
     
     return len(questions)
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python csv_to_xlsx_converter.py <input_csv> <output_xlsx>")
+    args = sys.argv[1:]
+    engine = 'openpyxl'
+    if len(args) == 4 and args[2] == '--engine':
+        engine = args[3]
+        args = args[:2]
+    
+    if len(args) != 2:
+        print("Usage: python csv_to_xlsx_converter.py <input_csv> <output_xlsx> [--engine openpyxl|xlsxwriter]")
         sys.exit(1)
     
-    input_csv = Path(sys.argv[1])
-    output_xlsx = Path(sys.argv[2])
+    input_csv = Path(args[0])
+    output_xlsx = Path(args[1])
     
     if not input_csv.exists():
         print(f"Error: Input file {input_csv} not found")
@@ -235,9 +375,9 @@ def main():
     
     # Generate section ID - prefer Source field, fallback to filename
     section_id = None
-    if questions and questions[0]['source']:
+    if questions and questions[0].source:
         # Use Source field from first question if available
-        section_id = questions[0]['source'].strip()
+        section_id = questions[0].source.strip()
         print(f"Using Source field for Section ID: {section_id}")
     else:
         # Fallback to filename generation
@@ -250,7 +390,11 @@ def main():
     
     # Create output XLSX
     print(f"Converting to XLSX format: {output_xlsx}")
-    question_count = create_xlsx_output(questions, output_xlsx, section_id)
+    try:
+        question_count = create_xlsx_output(questions, output_xlsx, section_id, engine)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
     print(f"✅ Successfully converted {question_count} questions to {output_xlsx}")
     print(f"Section ID: {section_id}")
@@ -14,6 +14,9 @@ import pandas as pd
 INPUT_CSV = "Input/PREP-FL 2nd Ed Final Question Excel Database 8-10-23.xlsx - Sheet1 (2).csv"
 OUTPUT_CSV = "Input/PREP-FL_intermediate.csv"
 
+# Question number suffixes that are duplicated in the source (X.2 - X.9)
+RENUMBER_SUFFIXES = frozenset('23456789')
+
 def transform_prep_fl_csv():
     """
     Transform PREP-FL CSV format to intermediate format
@@ -47,27 +50,21 @@ def transform_prep_fl_csv():
                 continue
 
             # Skip exam divider rows
-            if len(row) > 1 and row[1].startswith('Final Exam'):
+            if row[1].startswith('Final Exam'):
                 continue
 
-            # Extract question data by column index
-            question_stem = row[2].strip() if len(row) > 2 else ''
+            # Extract question data by column index (row has at least 8 columns)
+            (question_number, question_stem, answer_a, answer_b,
+             answer_c, answer_d, correct_answer) = map(str.strip, row[1:8])
             if not question_stem:
                 continue
 
-            answer_a = row[3].strip() if len(row) > 3 else ''
-            answer_b = row[4].strip() if len(row) > 4 else ''
-            answer_c = row[5].strip() if len(row) > 5 else ''
-            answer_d = row[6].strip() if len(row) > 6 else ''
-            correct_answer = row[7].strip() if len(row) > 7 else ''
-            question_number = row[1].strip() if len(row) > 1 else ''
-
             # Fix duplicate question numbers
             # If we've seen this number before and it's in the pattern X.2 through X.9
             if question_number in seen_numbers:
                 # Check if it matches the pattern that needs fixing (X.2 - X.9)
                 parts = question_number.split('.')
-                if len(parts) == 2 and parts[1] in ['2', '3', '4', '5', '6', '7', '8', '9']:
+                if len(parts) == 2 and parts[1] in RENUMBER_SUFFIXES:
                     # Add a trailing 0: 1.2 -> 1.20, 1.3 -> 1.30, etc.
                     question_number = f"{parts[0]}.{parts[1]}0"
 